@@ -5,6 +5,8 @@ A basic content-based recommendation system using Python
 
 import numpy as np
 from collections import defaultdict
+from functools import reduce
+from operator import or_
 
 class MovieRecommender:
     def __init__(self):
@@ -21,6 +23,37 @@ class MovieRecommender:
         }
         
         self.user_ratings = {}  # Stores user ratings: {movie_id: rating}
+
+        # Dense 0..N-1 index for the movie ids
+        self._idx_to_id = list(self.movies.keys())
+        self._id_to_idx = {movie_id: idx for idx, movie_id in enumerate(self._idx_to_id)}
+        movies = [self.movies[movie_id] for movie_id in self._idx_to_id]
+
+        # One bit per unique tag, so a movie's tag set is a single uint64 mask
+        self.tag_bits = {}
+        for movie in movies:
+            for tag in movie['tags']:
+                self.tag_bits.setdefault(tag, 1 << len(self.tag_bits))
+
+        # Feature columns indexed by dense movie index (self.movies is kept for display)
+        genre_index = {}
+        self.genres = np.array(
+            [genre_index.setdefault(movie['genre'], len(genre_index)) for movie in movies],
+            dtype=np.int16
+        )
+        self.years = np.array([movie['year'] for movie in movies], dtype=np.int16)
+        self.tag_masks = np.array(
+            [reduce(or_, (self.tag_bits[tag] for tag in movie['tags']), 0) for movie in movies],
+            dtype=np.uint64
+        )
+
+        # Plain-list copies for the scalar path; NumPy scalar reads are slow there
+        self._genre_list = self.genres.tolist()
+        self._year_list = self.years.tolist()
+        self._tag_mask_list = self.tag_masks.tolist()
+
+        # Movie metadata is static, so score every pair once up front
+        self.sim = self._build_similarity_matrix()
         
     def display_movies(self):
         """Display all available movies"""
@@ -43,23 +76,40 @@ class MovieRecommender:
             print("Movie not found")
             return False
     
+    def _build_similarity_matrix(self):
+        """Precompute the NxN similarity matrix used by get_recommendations"""
+        genres, years = self.genres, self.years
+
+        # Unpack the tag masks into a one-hot matrix of shape (N, n_unique_tags)
+        bit_positions = np.arange(len(self.tag_bits), dtype=np.uint64)
+        tag_matrix = ((self.tag_masks[:, None] >> bit_positions) & np.uint64(1)).astype(np.int16)
+
+        # Same scoring rules as calculate_similarity
+        genre_match = (genres[:, None] == genres[None, :]).astype(np.int16) * 3
+        tag_match = (tag_matrix @ tag_matrix.T) * 2
+        year_match = (np.abs(years[:, None] - years[None, :]) <= 5).astype(np.int16)
+
+        sim = genre_match + tag_match + year_match
+        np.fill_diagonal(sim, 0)
+        return sim
+
     def calculate_similarity(self, movie1_id, movie2_id):
         """Calculate similarity score between two movies"""
-        movie1 = self.movies[movie1_id]
-        movie2 = self.movies[movie2_id]
+        ia = self._id_to_idx[movie1_id]
+        ib = self._id_to_idx[movie2_id]
         
         score = 0
         
         # Genre matching (3 points)
-        if movie1['genre'] == movie2['genre']:
+        if self._genre_list[ia] == self._genre_list[ib]:
             score += 3
         
         # Tag matching (2 points per common tag)
-        common_tags = set(movie1['tags']) & set(movie2['tags'])
-        score += len(common_tags) * 2
+        common_tags = self._tag_mask_list[ia] & self._tag_mask_list[ib]
+        score += bin(common_tags).count('1') * 2
         
         # Year proximity (1 point if within 5 years)
-        if abs(movie1['year'] - movie2['year']) <= 5:
+        if abs(self._year_list[ia] - self._year_list[ib]) <= 5:
             score += 1
         
         return score
@@ -70,28 +120,25 @@ class MovieRecommender:
             print("\nNo ratings yet! Please rate some movies first.")
             return []
         
-        # Calculate scores for unrated movies
-        scores = {}
-        
-        for movie_id in self.movies.keys():
-            # Skip already rated movies
-            if movie_id in self.user_ratings:
-                continue
-            
-            # Calculate weighted score based on user's ratings
-            total_score = 0
-            for rated_id, rating in self.user_ratings.items():
-                similarity = self.calculate_similarity(movie_id, rated_id)
-                # Weight similarity by user rating (1-5)
-                total_score += similarity * rating
-            
-            scores[movie_id] = total_score
-        
-        # Sort by score and get top N recommendations
-        sorted_movies = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        top_recommendations = sorted_movies[:num_recommendations]
-        
-        return top_recommendations
+        # Rating vector over the whole catalog (0 for unrated movies)
+        rated_idx = [self._id_to_idx[movie_id] for movie_id in self.user_ratings]
+        ratings = np.zeros(len(self._idx_to_id))
+        ratings[rated_idx] = list(self.user_ratings.values())
+
+        # Weighted score of every movie against the user's ratings in one product
+        scores = self.sim @ ratings
+
+        # Skip already rated movies
+        scores[rated_idx] = -np.inf
+        num_recommendations = min(num_recommendations, len(self._idx_to_id) - len(rated_idx))
+        if num_recommendations <= 0:
+            return []
+
+        # Select the top N without sorting the whole catalog, then order just those
+        top_idx = np.argpartition(-scores, num_recommendations - 1)[:num_recommendations]
+        top_idx = top_idx[np.lexsort((top_idx, -scores[top_idx]))]
+
+        return [(self._idx_to_id[i], float(scores[i])) for i in top_idx]
     
     def display_recommendations(self):
         """Display personalized recommendations"""
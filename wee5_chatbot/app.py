@@ -5,8 +5,14 @@ MSAI-631 - AI for Human-Computer Interaction
 Clean implementation following Bot Framework patterns
 """
 
+import itertools
 import logging
+import operator
+import re
+import time
 from datetime import datetime
+from typing import Optional
+import orjson
 from aiohttp import web
 from aiohttp.web import Request, Response
 from botbuilder.core import ActivityHandler, TurnContext, MessageFactory
@@ -16,6 +22,23 @@ from botbuilder.schema import ChannelAccount, Activity
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Operators supported by /calculate
+_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+
+WELCOME_TEXT = "Welcome! I'm a Simple Traditional Chatbot. Type /help to get started."
+UNSUPPORTED_TEXT = "I can only process text messages right now."
+
+# Words in a lowercased message
+_WORD_RE = re.compile(r"\w+")
+
+# Longest input the bot will reverse; longer text is summarized instead
+_MAX_REVERSE_LEN = 4096
+
 class SimpleTraditionalBot(ActivityHandler):
     """
     Simple Traditional Chatbot that extends basic EchoBot functionality
@@ -42,7 +65,53 @@ class SimpleTraditionalBot(ActivityHandler):
             "Why did the robot go on a diet? It had a byte problem!",
             "What do you call a chatbot that sings? A vocal bot!"
         ]
-        self.joke_index = 0
+        self._joke_iter = itertools.cycle(self.jokes)
+
+        # Formatted current time, refreshed at most once per second
+        self._last_time_s = 0
+        self._last_time_str = ""
+
+        # Keyword intents, matched against the message's word set.
+        # Multi-word phrases are checked separately.
+        self._greetings = frozenset({'hello', 'hi', 'hey', 'greetings'})
+        self._farewells = frozenset({'bye', 'goodbye', 'farewell'})
+        self._help_words = frozenset({'help'})
+        self._capability_words = frozenset({'capabilities', 'features'})
+
+        # Question intents compiled into one pattern, run on the lowercased message
+        self._question_re = re.compile(
+            r'(?P<name>\bname\b)|(?P<time>\btime\b)|(?P<date>\bdate\b)|(?P<how>\bhow are you\b)'
+        )
+
+        # Help and capabilities replies never change, so build them once
+        self._help_text = """Available commands:
+/help - Show this help message
+/capabilities - List bot capabilities
+/reverse [text] - Reverse the provided text
+/time - Show current time
+/joke - Tell a joke
+/calculate [num1] [op] [num2] - Simple calculator
+
+You can also:
+- Say hello for a greeting
+- Say goodbye for farewell
+- Ask questions ending with ?
+- Type anything to see it echoed and reversed"""
+        self._capabilities_text = (
+            "My capabilities include:\n"
+            + "".join(f"{i}. {capability}\n" for i, capability in enumerate(self.capabilities, 1))
+            + "\nI can handle malformed questions and provide helpful responses."
+        )
+
+        # Slash command dispatch table; every handler takes the command args
+        self._commands = {
+            '/help': self._cmd_help,
+            '/capabilities': self._cmd_capabilities,
+            '/reverse': self._cmd_reverse,
+            '/time': self._cmd_time,
+            '/joke': self._cmd_joke,
+            '/calculate': self.simple_calculator,
+        }
 
     async def on_message_activity(self, turn_context: TurnContext):
         """Handle incoming message activity"""
@@ -57,38 +126,42 @@ class SimpleTraditionalBot(ActivityHandler):
         logger.info(f"Received message: {user_message}")
         
         # Process the message
-        response_text = self.process_message(user_message)
+        response_text = self.process_message(user_message, user_message.lower())
         
         # Send response
         await turn_context.send_activity(MessageFactory.text(response_text))
 
-    def process_message(self, message: str) -> str:
+    def process_message(self, message: str, message_lower: Optional[str] = None) -> str:
         """Process incoming message and return appropriate response"""
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
         
         # Command processing
         if message.startswith('/'):
             return self.handle_command(message)
         
+        # Tokenize once, then test each keyword set by intersection
+        tokens = frozenset(_WORD_RE.findall(message_lower))
+        
         # Greeting patterns
-        if any(greeting in message_lower for greeting in ['hello', 'hi', 'hey', 'greetings']):
+        if tokens & self._greetings:
             return "Hello! I'm a simple traditional chatbot. Type /help to see what I can do."
         
         # Farewell patterns  
-        if any(farewell in message_lower for farewell in ['bye', 'goodbye', 'see you', 'farewell']):
+        if tokens & self._farewells or 'see you' in message_lower:
             return "Goodbye! Thanks for chatting with me. Come back anytime!"
         
         # Help requests
-        if 'help' in message_lower or 'what can you do' in message_lower:
+        if tokens & self._help_words or 'what can you do' in message_lower:
             return self.show_help()
         
         # Capabilities inquiry
-        if 'capabilities' in message_lower or 'features' in message_lower:
+        if tokens & self._capability_words:
             return self.show_capabilities()
         
         # Question handling
         if message.endswith('?'):
-            return self.handle_question(message)
+            return self.handle_question(message, message_lower)
         
         # Default behavior - Enhanced echo with reversal
         return self.handle_default_echo(message)
@@ -99,25 +172,42 @@ class SimpleTraditionalBot(ActivityHandler):
         command = parts[0].lower()
         args = parts[1] if len(parts) > 1 else ""
         
-        if command == '/help':
-            return self.show_help()
-        elif command == '/capabilities':
-            return self.show_capabilities()
-        elif command == '/reverse':
-            if args:
-                return f"Reversed: {args[::-1]}"
-            else:
-                return "Usage: /reverse [text to reverse]"
-        elif command == '/time':
-            return f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        elif command == '/joke':
-            joke = self.jokes[self.joke_index]
-            self.joke_index = (self.joke_index + 1) % len(self.jokes)
-            return f"Here's a joke: {joke}"
-        elif command == '/calculate':
-            return self.simple_calculator(args)
-        else:
+        handler = self._commands.get(command)
+        if handler is None:
             return f"Unknown command: {command}. Type /help for available commands."
+        return handler(args)
+
+    def _cmd_help(self, args: str) -> str:
+        """Handle /help"""
+        return self.show_help()
+
+    def _cmd_capabilities(self, args: str) -> str:
+        """Handle /capabilities"""
+        return self.show_capabilities()
+
+    def _cmd_reverse(self, args: str) -> str:
+        """Handle /reverse"""
+        if not args.strip():
+            return "Usage: /reverse [text to reverse]"
+        if len(args) > _MAX_REVERSE_LEN:
+            return f"Text too long to reverse (limit is {_MAX_REVERSE_LEN} characters)"
+        return f"Reversed: {args[::-1]}"
+
+    def _cmd_time(self, args: str) -> str:
+        """Handle /time"""
+        return f"Current time: {self._current_time_str()}"
+
+    def _cmd_joke(self, args: str) -> str:
+        """Handle /joke"""
+        return f"Here's a joke: {next(self._joke_iter)}"
+
+    def _current_time_str(self) -> str:
+        """Current local time as 'YYYY-MM-DD HH:MM:SS', cached per second"""
+        s = int(time.time())
+        if s != self._last_time_s:
+            self._last_time_s = s
+            self._last_time_str = datetime.fromtimestamp(s).strftime('%Y-%m-%d %H:%M:%S')
+        return self._last_time_str
 
     def simple_calculator(self, expression: str) -> str:
         """Perform simple calculations"""
@@ -125,114 +215,105 @@ class SimpleTraditionalBot(ActivityHandler):
             return "Usage: /calculate [num1] [operator] [num2]. Example: /calculate 5 + 3"
         
         try:
-            parts = expression.split()
-            if len(parts) != 3:
+            parts = expression.split(maxsplit=2)
+            # maxsplit leaves extra tokens in the last part, e.g. "1 + 2 3"
+            if len(parts) != 3 or len(parts[2].split()) != 1:
                 return "Please use format: number operator number"
             
             num1 = float(parts[0])
-            operator = parts[1]
+            op = parts[1]
             num2 = float(parts[2])
             
-            if operator == '+':
-                result = num1 + num2
-            elif operator == '-':
-                result = num1 - num2
-            elif operator == '*':
-                result = num1 * num2
-            elif operator == '/':
-                if num2 == 0:
-                    return "Error: Cannot divide by zero"
-                result = num1 / num2
-            else:
-                return f"Unknown operator: {operator}. Use +, -, *, or /"
+            fn = _OPS.get(op)
+            if fn is None:
+                return f"Unknown operator: {op}. Use +, -, *, or /"
+            if op == '/' and num2 == 0:
+                return "Error: Cannot divide by zero"
+            result = fn(num1, num2)
             
-            return f"{num1} {operator} {num2} = {result}"
+            return f"{num1} {op} {num2} = {result}"
             
         except ValueError:
             return "Error: Please use valid numbers"
         except Exception as e:
             return f"Calculation error: {str(e)}"
 
-    def handle_question(self, message: str) -> str:
+    def handle_question(self, message: str, message_lower: Optional[str] = None) -> str:
         """Handle questions"""
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
+        
+        # Same priority as the keyword checks: name, time, date, how are you
+        intents = {match.lastgroup for match in self._question_re.finditer(message_lower)}
         
-        if 'name' in message_lower:
+        if 'name' in intents:
             return "I'm a Simple Traditional Chatbot built for MSAI-631."
-        elif 'time' in message_lower:
-            return f"The current time is {datetime.now().strftime('%H:%M:%S')}"
-        elif 'date' in message_lower:
-            return f"Today's date is {datetime.now().strftime('%Y-%m-%d')}"
-        elif 'how are you' in message_lower:
+        elif 'time' in intents:
+            return f"The current time is {self._current_time_str()[11:]}"
+        elif 'date' in intents:
+            return f"Today's date is {self._current_time_str()[:10]}"
+        elif 'how' in intents:
             return "I'm functioning well! All systems operational. How are you?"
+        elif len(message) > _MAX_REVERSE_LEN:
+            return f"That's an interesting question: {message[:200]}... (too long to reverse)"
         else:
             return f"That's an interesting question. Here it is reversed: {message[::-1]}"
 
     def handle_default_echo(self, message: str) -> str:
         """Default handler - Enhanced echo with reversal"""
+        if len(message) > _MAX_REVERSE_LEN:
+            return f"You said: {message[:200]}... (too long to reverse)"
         reversed_message = message[::-1]
         return f"You said: {message}. Reversed: {reversed_message}"
 
     def show_help(self) -> str:
         """Show available commands"""
-        return """Available commands:
-/help - Show this help message
-/capabilities - List bot capabilities
-/reverse [text] - Reverse the provided text
-/time - Show current time
-/joke - Tell a joke
-/calculate [num1] [op] [num2] - Simple calculator
-
-You can also:
-- Say hello for a greeting
-- Say goodbye for farewell
-- Ask questions ending with ?
-- Type anything to see it echoed and reversed"""
+        return self._help_text
 
     def show_capabilities(self) -> str:
         """Show bot capabilities"""
-        capabilities_text = "My capabilities include:\n"
-        for i, capability in enumerate(self.capabilities, 1):
-            capabilities_text += f"{i}. {capability}\n"
-        capabilities_text += "\nI can handle malformed questions and provide helpful responses."
-        return capabilities_text
+        return self._capabilities_text
 
     async def on_members_added_activity(self, members_added: [ChannelAccount], turn_context: TurnContext):
         """Greet new members"""
         for member in members_added:
             if member.id != turn_context.activity.recipient.id:
-                welcome_text = "Welcome! I'm a Simple Traditional Chatbot. Type /help to get started."
-                await turn_context.send_activity(MessageFactory.text(welcome_text))
+                await turn_context.send_activity(MessageFactory.text(WELCOME_TEXT))
 
 
 # Create bot instance
 BOT = SimpleTraditionalBot()
 
+# Bot identity shared by every response payload (only ever read)
+_FROM = {"id": "bot", "name": "SimpleTraditionalBot"}
+
+def _message_body(text: str) -> bytes:
+    """Serialize a bot reply payload"""
+    return orjson.dumps({"type": "message", "text": text, "from": _FROM})
+
+def _json_response(body: bytes) -> Response:
+    """Wrap already-serialized JSON bytes in a response"""
+    return web.Response(body=body, content_type="application/json", charset="utf-8")
+
+# Replies that never change are serialized once
+_WELCOME_BODY = _message_body(WELCOME_TEXT)
+_UNSUPPORTED_BODY = _message_body(UNSUPPORTED_TEXT)
+
 async def messages(req: Request) -> Response:
     """Main message handler endpoint"""
     try:
-        body = await req.json()
+        body = orjson.loads(await req.read())
         activity = Activity().deserialize(body)
         
         # Simple response for different activity types
         if activity.type == "message" and activity.text:
-            response_text = BOT.process_message(activity.text)
+            response_body = _message_body(BOT.process_message(activity.text))
         elif activity.type == "conversationUpdate" and activity.members_added:
-            response_text = "Welcome! I'm a Simple Traditional Chatbot. Type /help to get started."
+            response_body = _WELCOME_BODY
         else:
-            response_text = "I can only process text messages right now."
-        
-        # Create response
-        response_data = {
-            "type": "message",
-            "text": response_text,
-            "from": {
-                "id": "bot",
-                "name": "SimpleTraditionalBot"
-            }
-        }
+            response_body = _UNSUPPORTED_BODY
         
-        return web.json_response(response_data)
+        return _json_response(response_body)
         
     except Exception as e:
         logger.error(f"Error in messages handler: {e}")
@@ -240,7 +321,7 @@ async def messages(req: Request) -> Response:
 
 async def health_check(req: Request) -> Response:
     """Health check endpoint"""
-    return web.json_response({"status": "healthy", "bot": "SimpleTraditionalBot"})
+    return _json_response(orjson.dumps({"status": "healthy", "bot": "SimpleTraditionalBot"}))
 
 async def root_handler(req: Request) -> Response:
     """Root endpoint"""
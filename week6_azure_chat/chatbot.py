@@ -12,14 +12,29 @@ Project: AI Service Integration
 """
 
 import os
+import asyncio
+import functools
+import hashlib
+import inspect
 import logging
+import random
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Final, Mapping, Tuple
+import orjson
 from datetime import datetime
+import aiohttp
 from aiohttp import web
 from aiohttp.web import Request, Response
 from botbuilder.core import ActivityHandler, TurnContext, MessageFactory
 from botbuilder.schema import ChannelAccount, Activity
-from azure.ai.textanalytics import TextAnalyticsClient
+from azure.ai.textanalytics.aio import TextAnalyticsClient
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import AioHttpTransport
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +63,19 @@ class Config:
         "MS_AZURE_API_KEY"
     )
     
+    # Shared HTTP connection pool for Azure AI calls
+    AI_CONNECTION_POOL_SIZE = 50
+    AI_KEEPALIVE_TIMEOUT = 75  # seconds
+    
+    # Per-request document limits of the Azure AI Language endpoints
+    AI_SENTIMENT_BATCH_SIZE = 10
+    AI_ENTITY_BATCH_SIZE = 5
+    
+    # Fail fast on slow Azure calls instead of waiting out SDK defaults
+    AI_CONNECTION_TIMEOUT = 2.0  # seconds
+    AI_READ_TIMEOUT = 3.0  # seconds
+    AI_RESPONSE_TIMEOUT = 3.5  # seconds, for sentiment + entities together
+    
     @classmethod
     def validate_config(cls):
         """Validate that required configuration is present"""
@@ -63,6 +91,237 @@ class Config:
         
         return True
 
+class DocumentBatcher:
+    """
+    Coalesces single-document Text Analytics calls into batched requests
+    Messages arriving within max_delay of each other share one HTTP
+    round-trip, up to max_batch documents (the endpoint's per-call limit)
+    """
+    
+    def __init__(self, call, max_batch=10, max_delay=0.05):
+        self._call = call
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, text: str):
+        """Queue one document and wait for its result from the batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        
+        return await future
+
+    def _flush(self):
+        """Send everything queued so far as one request"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch):
+        """Call the service and hand each result back to its caller"""
+        try:
+            results = await self._call([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+class AnalysisCache:
+    """
+    Bounded LRU cache of (sentiment_result, entities) keyed by message text
+    Repeated messages are answered without another Azure round-trip
+    """
+    
+    def __init__(self, maxsize=10_000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Fixed-size digest of the message text"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes):
+        """Return the cached analysis, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: bytes, sentiment_result: dict, entities: list):
+        """Store an analysis, evicting the least recently used entry if full"""
+        self._entries[key] = (sentiment_result, entities)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# Response templates based on sentiment
+SENTIMENT_RESPONSES: Final[Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    "positive": (
+        "I'm glad you're feeling positive! How can I help you further?",
+        "Your positive energy is wonderful! What would you like to discuss?",
+        "It's great to sense your enthusiasm! What can I do for you?",
+        "I appreciate your positive outlook! How may I assist you?"
+    ),
+    "negative": (
+        "I sense you might be frustrated. Let me try to help you better.",
+        "I understand this might be challenging. How can I assist you?",
+        "I'm here to help. Let's see what we can do to improve things.",
+        "I want to make this better for you. What specifically can I help with?"
+    ),
+    "neutral": (
+        "I understand. How can I help you today?",
+        "Got it. What would you like to know?",
+        "Understood. What can I do for you?",
+        "I'm here to help. What do you need?"
+    ),
+    "mixed": (
+        "I sense mixed feelings in your message. Let me help clarify things.",
+        "I understand this is complex. How can I best assist you?",
+        "I see there are different aspects to consider. What's most important to you?"
+    )
+})
+
+# Bot capabilities
+CAPABILITIES = (
+    "Sentiment analysis of your messages",
+    "Entity recognition and extraction",
+    "Intelligent response generation",
+    "Command processing",
+    "Conversation context awareness",
+    "Help and capability information"
+)
+
+CAPABILITIES_TEXT = (
+    "BOT CAPABILITIES:\n\n"
+    + "".join(f"{i}. {capability}\n" for i, capability in enumerate(CAPABILITIES, 1))
+    + "\nPowered by Azure AI Language Services"
+)
+CAPABILITIES_BASIC_TEXT = CAPABILITIES_TEXT + "\n\nNote: AI features currently unavailable"
+
+WELCOME_TEXT = """
+Welcome to the AI-Integrated Chatbot!
+
+I use Azure AI Language Services to analyze sentiment and understand your messages better.
+
+Type /help to get started, or just start chatting naturally!
+""".strip()
+
+# Reply when Azure is configured but did not answer within AI_RESPONSE_TIMEOUT
+AI_TIMEOUT_TEXT = (
+    "AI analysis is taking too long right now. Please try again in a moment.\n"
+    "Type /help for available commands."
+)
+
+# Reply layout for generate_ai_response
+AI_REPLY_TMPL = (
+    "{greeting}{sentiment_block}{entity_block}"
+    "\n\nType /help to see what else I can do, or continue our conversation!"
+)
+SENTIMENT_BLOCK_TMPL = "\n\nSentiment Analysis: {sentiment} (confidence: {confidence:.2%})"
+# 'mixed' has no confidence score of its own
+SENTIMENT_LABEL_TMPL = "\n\nSentiment Analysis: {sentiment}"
+ENTITY_BLOCK_TMPL = "\n\nI detected {count} key entities in your message:{lines}"
+ENTITY_LINE_TMPL = "\n  - {text}: {category}"
+
+def _parse_cmd(message: str) -> Tuple[str, str]:
+    """Split a slash command into (lowercased command, args) in one pass"""
+    sp = message.find(' ')
+    if sp > 0:
+        # Commands with arguments (e.g. long /analyze text) are sliced, never cached
+        return message[:sp].lower(), message[sp + 1:]
+    return _parse_bare_cmd(message)
+
+@functools.lru_cache(maxsize=256)
+def _parse_bare_cmd(message: str) -> Tuple[str, str]:
+    """Parse an argument-less command such as /help, cached for reuse"""
+    return message.lower(), ''
+
+# Messages kept per user; older ones are dropped as new ones arrive
+HISTORY_MAX_MESSAGES = 200
+
+# Messages listed by /history
+HISTORY_DISPLAY_COUNT = 10
+
+@dataclass
+class UserHistory:
+    """
+    Recent messages for one user, stored as parallel columns
+    timestamps holds unix times as a packed array of doubles
+    """
+    timestamps: array = field(default_factory=lambda: array('d'))
+    messages: deque = field(default_factory=lambda: deque(maxlen=HISTORY_MAX_MESSAGES))
+
+    def append(self, timestamp: float, message: str):
+        """Record a message, evicting the oldest one once full"""
+        if len(self.messages) == self.messages.maxlen:
+            del self.timestamps[0]
+        self.timestamps.append(timestamp)
+        self.messages.append(message)
+
+    def __len__(self):
+        return len(self.messages)
+
+@dataclass
+class SentenceScores:
+    """
+    Per-sentence sentiment stored as parallel columns
+    Confidence scores are packed arrays of doubles, one entry per sentence
+    """
+    text: list = field(default_factory=list)
+    sentiment: list = field(default_factory=list)
+    positive: array = field(default_factory=lambda: array('d'))
+    neutral: array = field(default_factory=lambda: array('d'))
+    negative: array = field(default_factory=lambda: array('d'))
+
+    def append(self, sentence):
+        """Add one sentence result from the Azure SDK"""
+        self.text.append(sentence.text)
+        self.sentiment.append(sentence.sentiment)
+        self.positive.append(sentence.confidence_scores.positive)
+        self.neutral.append(sentence.confidence_scores.neutral)
+        self.negative.append(sentence.confidence_scores.negative)
+
+    def weighted_scores(self):
+        """Confidence scores averaged over sentences, weighted by sentence length"""
+        lengths = [len(text) for text in self.text]
+        total = sum(lengths)
+        if not total:
+            return None
+        return {
+            'positive': sum(w * x for w, x in zip(lengths, self.positive)) / total,
+            'neutral': sum(w * x for w, x in zip(lengths, self.neutral)) / total,
+            'negative': sum(w * x for w, x in zip(lengths, self.negative)) / total
+        }
+
+    def __len__(self):
+        return len(self.text)
+
 class AIIntegratedBot(ActivityHandler):
     """
     Enhanced chatbot with Azure AI Language Services integration
@@ -73,56 +332,72 @@ class AIIntegratedBot(ActivityHandler):
         super().__init__()
         logger.info("Initializing AI-Integrated Chatbot")
         
-        # Store Azure AI client
+        # Azure AI client; attached later by init_text_analytics_client once the loop runs
+        self.text_analytics_client = None
+        self.ai_enabled = False
+        if text_analytics_client is not None:
+            self.set_text_analytics_client(text_analytics_client)
+        
+        # Per-bot generator for picking sentiment responses
+        self._rng = random.Random()
+        
+        # Conversation history for context
+        self.conversation_history = {}
+        
+        # Analysis results for messages seen before
+        self.analysis_cache = AnalysisCache()
+        
+        # Command dispatch table; every handler takes (args, sentiment_result, entities, user_id)
+        self._commands = {
+            '/help': self._cmd_help,
+            '/capabilities': self._cmd_capabilities,
+            '/analyze': self._cmd_analyze,
+            '/history': self._cmd_history,
+            '/clear': self._cmd_clear,
+        }
+        
+        logger.info("Bot initialization complete")
+
+    def set_text_analytics_client(self, text_analytics_client):
+        """Attach the Azure AI client, or fall back to basic mode if it is None"""
         self.text_analytics_client = text_analytics_client
         self.ai_enabled = text_analytics_client is not None
         
         if self.ai_enabled:
             logger.info("Azure AI Services enabled")
+            
+            # Batch concurrent messages into shared Azure requests
+            self._sentiment_batcher = DocumentBatcher(
+                self._nonblocking_call(
+                    text_analytics_client.analyze_sentiment,
+                    show_opinion_mining=True
+                ),
+                max_batch=Config.AI_SENTIMENT_BATCH_SIZE
+            )
+            self._entity_batcher = DocumentBatcher(
+                self._nonblocking_call(text_analytics_client.recognize_entities),
+                max_batch=Config.AI_ENTITY_BATCH_SIZE
+            )
         else:
             logger.warning("Azure AI Services not available - running in basic mode")
-        
-        # Bot capabilities
-        self.capabilities = [
-            "Sentiment analysis of your messages",
-            "Entity recognition and extraction",
-            "Intelligent response generation",
-            "Command processing",
-            "Conversation context awareness",
-            "Help and capability information"
-        ]
-        
-        # Response templates based on sentiment
-        self.sentiment_responses = {
-            "positive": [
-                "I'm glad you're feeling positive! How can I help you further?",
-                "Your positive energy is wonderful! What would you like to discuss?",
-                "It's great to sense your enthusiasm! What can I do for you?",
-                "I appreciate your positive outlook! How may I assist you?"
-            ],
-            "negative": [
-                "I sense you might be frustrated. Let me try to help you better.",
-                "I understand this might be challenging. How can I assist you?",
-                "I'm here to help. Let's see what we can do to improve things.",
-                "I want to make this better for you. What specifically can I help with?"
-            ],
-            "neutral": [
-                "I understand. How can I help you today?",
-                "Got it. What would you like to know?",
-                "Understood. What can I do for you?",
-                "I'm here to help. What do you need?"
-            ],
-            "mixed": [
-                "I sense mixed feelings in your message. Let me help clarify things.",
-                "I understand this is complex. How can I best assist you?",
-                "I see there are different aspects to consider. What's most important to you?"
-            ]
-        }
-        
-        # Conversation history for context
-        self.conversation_history = {}
-        
-        logger.info("Bot initialization complete")
+
+    @staticmethod
+    def _nonblocking_call(method, **kwargs):
+        """
+        Wrap a Text Analytics client method as a coroutine taking documents
+        Async (aio) client methods are awaited directly; synchronous client
+        methods run in the default executor so they never block the event loop
+        """
+        if inspect.iscoroutinefunction(method):
+            async def call(documents):
+                return await method(documents=documents, **kwargs)
+        else:
+            async def call(documents):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    None, functools.partial(method, documents=documents, **kwargs)
+                )
+        return call
 
     async def on_message_activity(self, turn_context: TurnContext):
         """Handle incoming message with AI sentiment analysis"""
@@ -135,22 +410,27 @@ class AIIntegratedBot(ActivityHandler):
             return
         
         user_message = user_message.strip()
-        logger.info(f"Received message from {user_id}: {user_message}")
+        
+        # Share one copy of known command tokens across users; arbitrary text is
+        # never interned, since interned strings are immortal on Python 3.12
+        if user_message in self._commands:
+            user_message = sys.intern(user_message)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Received message from %s: %s", user_id, user_message)
         
         # Store conversation history
-        if user_id not in self.conversation_history:
-            self.conversation_history[user_id] = []
+        history = self.conversation_history.get(user_id)
+        if history is None:
+            history = self.conversation_history[user_id] = UserHistory()
         
-        self.conversation_history[user_id].append({
-            'timestamp': datetime.now(),
-            'message': user_message
-        })
+        history.append(time.time(), user_message)
         
         # Process message with AI analysis if available
         if self.ai_enabled:
             response_text = await self.process_with_ai(user_message, turn_context)
         else:
-            response_text = self.process_basic(user_message)
+            response_text = self.process_basic(user_message, user_id)
         
         # Send response
         await turn_context.send_activity(MessageFactory.text(response_text))
@@ -158,31 +438,63 @@ class AIIntegratedBot(ActivityHandler):
     async def process_with_ai(self, message: str, turn_context: TurnContext):
         """Process message using Azure AI services"""
         try:
-            # Perform sentiment analysis
-            sentiment_result = await self.analyze_sentiment(message)
-            
-            # Perform entity recognition
-            entities = await self.recognize_entities(message)
-            
-            # Check for commands first
+            # Check for commands first; only /analyze needs the AI services
             if message.startswith('/'):
-                return self.handle_command(message, sentiment_result, entities)
+                sentiment_result, entities = None, []
+                parsed = _parse_cmd(message)
+                command, args = parsed
+                if command == '/analyze' and args:
+                    sentiment_result, entities = await self.analyze_text(args, need_detail=True)
+                user_id = turn_context.activity.from_property.id
+                return self.handle_command(message, sentiment_result, entities, user_id, parsed)
+            
+            sentiment_result, entities = await self.analyze_text(message)
             
             # Generate intelligent response based on AI analysis
             return self.generate_ai_response(message, sentiment_result, entities)
             
+        except asyncio.TimeoutError:
+            logger.warning("AI analysis timed out after %ss", Config.AI_RESPONSE_TIMEOUT)
+            return AI_TIMEOUT_TEXT
+            
         except Exception as e:
-            logger.error(f"Error in AI processing: {e}")
+            logger.error("Error in AI processing: %s", e)
             return f"I processed your message but encountered an issue with AI analysis. Here's what you said: {message}"
 
-    async def analyze_sentiment(self, text: str):
-        """Analyze sentiment using Azure AI Language Service"""
+    async def analyze_text(self, text: str, need_detail: bool = False):
+        """Sentiment and entities for text, served from the cache when possible"""
+        cache_key = AnalysisCache.key(text)
+        cached = self.analysis_cache.get(cache_key)
+        # A cached result without sentence detail cannot serve /analyze
+        if cached is not None and (not need_detail or cached[0]['sentences'] is not None):
+            return cached
+        
+        # Perform sentiment analysis and entity recognition concurrently,
+        # bounded so a stuck Azure call cannot hold up the reply
+        sentiment_result, entities = await asyncio.wait_for(
+            asyncio.gather(
+                self.analyze_sentiment(text, need_detail),
+                self.recognize_entities(text)
+            ),
+            timeout=Config.AI_RESPONSE_TIMEOUT
+        )
+        
+        # Only cache successful analyses so transient failures are retried
+        if sentiment_result is not None and entities is not None:
+            self.analysis_cache.put(cache_key, sentiment_result, entities)
+        
+        if entities is None:
+            entities = []
+        
+        return sentiment_result, entities
+
+    async def analyze_sentiment(self, text: str, need_detail: bool = False):
+        """
+        Analyze sentiment using Azure AI Language Service
+        Per-sentence results are only collected when need_detail is set (/analyze)
+        """
         try:
-            documents = [text]
-            response = self.text_analytics_client.analyze_sentiment(
-                documents=documents,
-                show_opinion_mining=True
-            )[0]
+            response = await self._sentiment_batcher.submit(text)
             
             sentiment_info = {
                 'sentiment': response.sentiment,
@@ -191,35 +503,29 @@ class AIIntegratedBot(ActivityHandler):
                     'neutral': response.confidence_scores.neutral,
                     'negative': response.confidence_scores.negative
                 },
-                'sentences': []
+                'sentences': None
             }
             
             # Analyze individual sentences
-            for sentence in response.sentences:
-                sentiment_info['sentences'].append({
-                    'text': sentence.text,
-                    'sentiment': sentence.sentiment,
-                    'confidence_scores': {
-                        'positive': sentence.confidence_scores.positive,
-                        'neutral': sentence.confidence_scores.neutral,
-                        'negative': sentence.confidence_scores.negative
-                    }
-                })
+            if need_detail:
+                sentiment_info['sentences'] = SentenceScores()
+                for sentence in response.sentences:
+                    sentiment_info['sentences'].append(sentence)
             
-            logger.info(f"Sentiment analysis: {response.sentiment}")
+            logger.info("Sentiment analysis: %s", response.sentiment)
             return sentiment_info
             
         except Exception as e:
-            logger.error(f"Sentiment analysis error: {e}")
+            logger.error("Sentiment analysis error: %s", e)
             return None
 
     async def recognize_entities(self, text: str):
-        """Recognize entities using Azure AI Language Service"""
+        """
+        Recognize entities using Azure AI Language Service
+        Returns None on failure so it is not mistaken for "no entities"
+        """
         try:
-            documents = [text]
-            response = self.text_analytics_client.recognize_entities(
-                documents=documents
-            )[0]
+            response = await self._entity_batcher.submit(text)
             
             entities = []
             for entity in response.entities:
@@ -231,80 +537,86 @@ class AIIntegratedBot(ActivityHandler):
                 })
             
             if entities:
-                logger.info(f"Recognized {len(entities)} entities")
+                logger.info("Recognized %d entities", len(entities))
             
             return entities
             
         except Exception as e:
-            logger.error(f"Entity recognition error: {e}")
-            return []
+            logger.error("Entity recognition error: %s", e)
+            return None
 
     def generate_ai_response(self, message: str, sentiment_result: dict, entities: list):
         """Generate intelligent response based on AI analysis"""
-        import random
+        greeting = ""
+        sentiment_block = ""
+        entity_block = ""
         
-        response_parts = []
-        
-        # Add sentiment-aware greeting
+        # Sentiment-aware greeting and sentiment details
         if sentiment_result:
             sentiment = sentiment_result['sentiment']
-            confidence = sentiment_result['confidence_scores']
-            
-            # Select appropriate response based on sentiment
-            if sentiment in self.sentiment_responses:
-                greeting = random.choice(self.sentiment_responses[sentiment])
-                response_parts.append(greeting)
-            
-            # Add sentiment details
-            response_parts.append(
-                f"\n\nSentiment Analysis: {sentiment.upper()} "
-                f"(confidence: {confidence[sentiment]:.2%})"
-            )
+            responses = SENTIMENT_RESPONSES.get(sentiment)
+            if responses:
+                greeting = self._rng.choice(responses)
+            confidence = sentiment_result['confidence_scores'].get(sentiment)
+            if confidence is None:
+                sentiment_block = SENTIMENT_LABEL_TMPL.format(sentiment=sentiment.upper())
+            else:
+                sentiment_block = SENTIMENT_BLOCK_TMPL.format(
+                    sentiment=sentiment.upper(),
+                    confidence=confidence
+                )
         
-        # Add entity information if found
+        # Entity information if found (top 5 entities)
         if entities:
-            response_parts.append(f"\n\nI detected {len(entities)} key entities in your message:")
-            for entity in entities[:5]:  # Show top 5 entities
-                response_parts.append(
-                    f"  - {entity['text']}: {entity['category']}"
-                )
+            entity_block = ENTITY_BLOCK_TMPL.format(
+                count=len(entities),
+                lines="".join(ENTITY_LINE_TMPL.format_map(entity) for entity in entities[:5])
+            )
         
-        # Add helpful suggestion
-        response_parts.append(
-            "\n\nType /help to see what else I can do, or continue our conversation!"
+        return AI_REPLY_TMPL.format(
+            greeting=greeting,
+            sentiment_block=sentiment_block,
+            entity_block=entity_block
         )
-        
-        return "".join(response_parts)
 
-    def handle_command(self, message: str, sentiment_result: dict, entities: list):
-        """Handle bot commands"""
-        parts = message.split(' ', 1)
-        command = parts[0].lower()
-        args = parts[1] if len(parts) > 1 else ""
-        
-        if command == '/help':
-            return self.show_help()
-        
-        elif command == '/capabilities':
-            return self.show_capabilities()
-        
-        elif command == '/analyze':
-            if args:
-                if sentiment_result:
-                    return self.detailed_analysis(args, sentiment_result, entities)
-                else:
-                    return "AI analysis not available. Please configure Azure AI services."
-            else:
-                return "Usage: /analyze [your text]\nExample: /analyze I love this chatbot!"
-        
-        elif command == '/history':
-            return self.show_history()
-        
-        elif command == '/clear':
-            return "Conversation history cleared. Let's start fresh!"
+    def handle_command(self, message: str, sentiment_result: dict, entities: list,
+                       user_id: str = None, parsed: Tuple[str, str] = None):
+        """
+        Handle bot commands
+        parsed is the (command, args) pair when the caller has already parsed message
+        """
+        command, args = parsed if parsed is not None else _parse_cmd(message)
         
-        else:
+        handler = self._commands.get(command)
+        if handler is None:
             return f"Unknown command: {command}\nType /help for available commands."
+        return handler(args, sentiment_result, entities, user_id)
+
+    def _cmd_help(self, args: str, sentiment_result: dict, entities: list, user_id: str):
+        """Handle /help"""
+        return self.show_help
+
+    def _cmd_capabilities(self, args: str, sentiment_result: dict, entities: list, user_id: str):
+        """Handle /capabilities"""
+        return self.show_capabilities
+
+    def _cmd_analyze(self, args: str, sentiment_result: dict, entities: list, user_id: str):
+        """Handle /analyze"""
+        if not args:
+            return "Usage: /analyze [your text]\nExample: /analyze I love this chatbot!"
+        if not sentiment_result:
+            return "AI analysis not available. Please configure Azure AI services."
+        return self.detailed_analysis(args, sentiment_result, entities)
+
+    def _cmd_history(self, args: str, sentiment_result: dict, entities: list, user_id: str):
+        """Handle /history"""
+        return self.show_history(user_id)
+
+    def _cmd_clear(self, args: str, sentiment_result: dict, entities: list, user_id: str):
+        """Handle /clear"""
+        self.conversation_history.pop(user_id, None)
+        self.analysis_cache.clear()
+        return "Conversation history cleared. Let's start fresh!"
 
     def detailed_analysis(self, text: str, sentiment_result: dict, entities: list):
         """Provide detailed AI analysis of text"""
@@ -319,12 +631,17 @@ class AIIntegratedBot(ActivityHandler):
                 analysis.append(f"  {sent_type.capitalize()}: {score:.2%}")
             
             # Sentence-level analysis
-            if sentiment_result['sentences']:
+            sentences = sentiment_result['sentences']
+            if sentences:
                 analysis.append("\nSentence-by-Sentence Analysis:")
-                for i, sentence in enumerate(sentiment_result['sentences'], 1):
-                    analysis.append(
-                        f"  {i}. \"{sentence['text']}\" - {sentence['sentiment']}"
-                    )
+                for i, (text, sentiment) in enumerate(zip(sentences.text, sentences.sentiment), 1):
+                    analysis.append(f"  {i}. \"{text}\" - {sentiment}")
+                
+                weighted = sentences.weighted_scores() if len(sentences) > 1 else None
+                if weighted:
+                    analysis.append("\nLength-Weighted Sentence Scores:")
+                    for sent_type, score in weighted.items():
+                        analysis.append(f"  {sent_type.capitalize()}: {score:.2%}")
         
         # Entity analysis
         if entities:
@@ -339,8 +656,9 @@ class AIIntegratedBot(ActivityHandler):
         
         return "\n".join(analysis)
 
+    @functools.cached_property
     def show_help(self):
-        """Display help information"""
+        """Help text, built once per bot"""
         help_text = """
 AI-INTEGRATED CHATBOT HELP
 
@@ -369,26 +687,34 @@ Example Interactions:
         """
         return help_text.strip()
 
+    @property
     def show_capabilities(self):
-        """Display bot capabilities"""
-        capabilities_text = "BOT CAPABILITIES:\n\n"
-        for i, capability in enumerate(self.capabilities, 1):
-            capabilities_text += f"{i}. {capability}\n"
-        
-        capabilities_text += "\nPowered by Azure AI Language Services"
-        if not self.ai_enabled:
-            capabilities_text += "\n\nNote: AI features currently unavailable"
-        
-        return capabilities_text
+        """Capabilities text for the current AI mode"""
+        return CAPABILITIES_TEXT if self.ai_enabled else CAPABILITIES_BASIC_TEXT
 
-    def show_history(self):
+    def show_history(self, user_id: str):
         """Show conversation history"""
-        return "Conversation history feature coming soon!"
+        history = self.conversation_history.get(user_id)
+        
+        # Leave out the /history command that triggered this
+        count = len(history) - 1 if history else 0
+        if count <= 0:
+            return "No conversation history yet. Start chatting!"
+        
+        shown = min(count, HISTORY_DISPLAY_COUNT)
+        start = count - shown
+        lines = [f"RECENT CONVERSATION (last {shown} messages):\n"]
+        for i in range(start, count):
+            # Timestamps are stored as unix times and only formatted here
+            timestamp = datetime.fromtimestamp(history.timestamps[i]).isoformat(timespec='seconds')
+            lines.append(f"  [{timestamp}] {history.messages[i]}")
+        
+        return "\n".join(lines)
 
-    def process_basic(self, message: str):
+    def process_basic(self, message: str, user_id: str = None):
         """Basic processing when AI is not available"""
         if message.startswith('/'):
-            return self.handle_command(message, None, [])
+            return self.handle_command(message, None, [], user_id)
         
         return (
             f"I received your message: \"{message}\"\n\n"
@@ -400,18 +726,14 @@ Example Interactions:
         """Greet new members"""
         for member in members_added:
             if member.id != turn_context.activity.recipient.id:
-                welcome_text = """
-Welcome to the AI-Integrated Chatbot!
-
-I use Azure AI Language Services to analyze sentiment and understand your messages better.
-
-Type /help to get started, or just start chatting naturally!
-                """.strip()
-                await turn_context.send_activity(MessageFactory.text(welcome_text))
+                await turn_context.send_activity(MessageFactory.text(WELCOME_TEXT))
 
 
 def create_text_analytics_client():
-    """Create Azure Text Analytics client"""
+    """
+    Create Azure Text Analytics client
+    Must run inside the event loop, since the transport's aiohttp session binds to it
+    """
     try:
         endpoint = Config.AI_SERVICE_ENDPOINT
         key = Config.AI_SERVICE_KEY
@@ -421,42 +743,61 @@ def create_text_analytics_client():
             return None
         
         credential = AzureKeyCredential(key)
+        # One shared keep-alive connection pool for every Azure call;
+        # the transport owns the session and closes it with the client
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=Config.AI_CONNECTION_POOL_SIZE,
+                keepalive_timeout=Config.AI_KEEPALIVE_TIMEOUT
+            )
+        )
         client = TextAnalyticsClient(
             endpoint=endpoint,
-            credential=credential
+            credential=credential,
+            transport=AioHttpTransport(
+                session=session,
+                connection_timeout=Config.AI_CONNECTION_TIMEOUT,
+                read_timeout=Config.AI_READ_TIMEOUT
+            )
         )
         
-        logger.info(f"Text Analytics client created for endpoint: {endpoint}")
+        logger.info("Text Analytics client created for endpoint: %s", endpoint)
         return client
         
     except Exception as e:
-        logger.error(f"Failed to create Text Analytics client: {e}")
+        logger.error("Failed to create Text Analytics client: %s", e)
         return None
 
 
-# Initialize bot and client
-text_analytics_client = create_text_analytics_client()
-BOT = AIIntegratedBot(text_analytics_client)
+# Initialize bot; the Azure client is attached on app startup
+BOT = AIIntegratedBot()
+
+
+class MockTurnContext:
+    """Minimal turn context that collects replies for the HTTP endpoint"""
+    
+    __slots__ = ("activity", "responses")
+    
+    def __init__(self, activity):
+        self.activity = activity
+        self.responses = []
+    
+    async def send_activity(self, message):
+        self.responses.append(message.text)
+
+
+def _json_response(data) -> Response:
+    """JSON response serialized with orjson, written straight as bytes"""
+    return web.Response(body=orjson.dumps(data), content_type="application/json", charset="utf-8")
 
 
 async def messages(req: Request) -> Response:
     """Handle incoming messages"""
     try:
-        body = await req.json()
+        body = orjson.loads(await req.read())
         activity = Activity().deserialize(body)
         
         if activity.type == "message" and activity.text:
-            response_text = BOT.process_basic(activity.text) if not BOT.ai_enabled else "Processing..."
-            
-            # Create mock turn context for processing
-            class MockTurnContext:
-                def __init__(self, activity):
-                    self.activity = activity
-                    self.responses = []
-                
-                async def send_activity(self, message):
-                    self.responses.append(message.text)
-            
             mock_context = MockTurnContext(activity)
             await BOT.on_message_activity(mock_context)
             
@@ -476,10 +817,10 @@ async def messages(req: Request) -> Response:
             }
         }
         
-        return web.json_response(response_data)
+        return _json_response(response_data)
         
     except Exception as e:
-        logger.error(f"Error in messages handler: {e}")
+        logger.error("Error in messages handler: %s", e)
         return web.Response(text="Error processing message", status=500)
 
 
@@ -491,7 +832,7 @@ async def health_check(req: Request) -> Response:
         "ai_enabled": BOT.ai_enabled,
         "timestamp": datetime.now().isoformat()
     }
-    return web.json_response(health_status)
+    return _json_response(health_status)
 
 
 async def root_handler(req: Request) -> Response:
@@ -506,8 +847,33 @@ async def root_handler(req: Request) -> Response:
     )
 
 
+async def init_text_analytics_client(app):
+    """Create the Azure client on startup, once the event loop is running"""
+    BOT.set_text_analytics_client(create_text_analytics_client())
+
+
+async def close_text_analytics_client(app):
+    """Close the Azure client and its connection pool on shutdown"""
+    if BOT.text_analytics_client is not None:
+        await BOT.text_analytics_client.close()
+
+
+async def enable_eager_tasks(app):
+    """
+    Run new tasks eagerly on Python 3.12+
+    Cache hits and other awaits that finish immediately then skip a trip
+    through the event loop scheduler
+    """
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
+
 # Create web application
+# Serve with one worker per CPU via: gunicorn chatbot:app -k aiohttp.GunicornWebWorker -w <N>
 app = web.Application()
+app.on_startup.append(enable_eager_tasks)
+app.on_startup.append(init_text_analytics_client)
+app.on_cleanup.append(close_text_analytics_client)
 app.router.add_post("/api/messages", messages)
 app.router.add_get("/health", health_check)
 app.router.add_get("/", root_handler)
@@ -525,6 +891,8 @@ if __name__ == "__main__":
     print("\nEnvironment Variables Needed:")
     print("  SET MicrosoftAIServiceEndpoint=<your_endpoint>")
     print("  SET MicrosoftAPIKey=<your_key>")
+    print("\nFor one worker per CPU (Linux/macOS):")
+    print("  gunicorn chatbot:app -k aiohttp.GunicornWebWorker -w $(nproc) -b localhost:3978")
     print("\nPress Ctrl+C to stop")
     print("="*60)
     